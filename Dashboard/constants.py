@@ -8,6 +8,9 @@ import pandas as pd
 # Répertoire des données
 DATA_DIR = Path("data")
 
+# Répertoire du cache Parquet (agrégations pré-calculées)
+CACHE_DIR = Path("cache")
+
 # -----------------------------------------------------------
 # Liste des éruptions (fichiers + timestamp de référence)
 # -----------------------------------------------------------
@@ -0,0 +1,227 @@
+# ============================================
+# dashboard_common.py — sections Streamlit du dashboard
+# ============================================
+
+import hashlib
+import os
+import streamlit as st
+import pandas as pd
+import numpy as np
+from streamlit_folium import st_folium
+
+from Dashboard_VF.Dashboard.constants import DATA_DIR, eruptions, color_map, station_coords
+from Dashboard_VF.Dashboard.data_loader import (
+    load_eruption_file, load_resampled, load_station_list, network_mean, warm_resampled
+)
+from Dashboard_VF.Dashboard.graphing import plot_amplitude, plot_rsam, plot_energy, plot_confidence
+from Dashboard_VF.Dashboard.mapping import create_station_map
+
+# Options des widgets, construites une seule fois (même objet à chaque rerun)
+_ERUPTION_KEYS = tuple(eruptions.keys())
+_STATION_KEYS = tuple(station_coords.keys())
+
+# Seuils RSAM -> (niveau, couleur, emoji)
+_RSAM_TH = np.array([800, 1500, 3000, 5000])
+_RSAM_META = [
+    ("NORMAL", "#00b300", "🟢"),
+    ("MOYEN (<48h)", "#ffd700", "🟡"),
+    ("ÉLEVÉ (<12h)", "#ff6600", "🟠"),
+    ("IMMINENT (<1h)", "#e60000", "🔴"),
+    ("ÉRUPTION", "#9f00e0", "🟪"),
+]
+
+# -----------------------------------------------------------
+# Données mises en cache
+# -----------------------------------------------------------
+
+# Compute latest RSAM from last eruption (scalaire mis en cache 1h)
+@st.cache_data(ttl=3600, show_spinner=False)
+def _latest_rsam():
+    df_latest = load_eruption_file(_ERUPTION_KEYS[-1]).tail(100)
+    return float(df_latest["amplitude_mean"].mean()) if "amplitude_mean" in df_latest else 500.0
+
+
+def _source_mtime(name):
+    return os.path.getmtime(DATA_DIR / eruptions[name]["file"])
+
+
+@st.cache_resource
+def _resampled_eruption(name, mtime):
+    # Fenêtre ré-échantillonnée par station, partagée entre toutes les sessions
+    # (mtime dans la clé : un CSV modifié invalide l'entrée)
+    return load_resampled(name)
+
+
+def load_aligned_selected(selected_list, selected_stations):
+    """
+    Comparatif aligné des éruptions et stations choisies. La sélection est
+    normalisée (ordre chronologique, stations triées) avant l'appel mis en
+    cache : un même ensemble réutilise la même entrée quel que soit l'ordre.
+    Les dates de modification des CSV font partie de la clé du cache.
+    """
+    names = tuple(name for name in eruptions if name in selected_list)
+    return _load_aligned(
+        names,
+        tuple(sorted(selected_stations)),
+        tuple(_source_mtime(name) for name in names)
+    )
+
+
+@st.cache_data
+def _load_aligned(selected_list, selected_stations, mtimes):
+    # Caches Parquet manquants : construits en parallèle avant la boucle
+    warm_resampled(selected_list)
+
+    frames = []
+    for name, mtime in zip(selected_list, mtimes):
+        frame = _resampled_eruption(name, mtime)
+
+        # station est catégorielle : masque sur les codes entiers, sans copie
+        stations = frame["station"].cat
+        keep = np.flatnonzero(stations.categories.isin(selected_stations))
+        df = frame[np.isin(stations.codes.to_numpy(), keep)]
+        if df.empty:
+            continue
+
+        # Moyenne réseau sur les stations retenues, pondérée par les comptages
+        res = network_mean(df)
+
+        res["hours_to_eruption"] = (res["time_min"] - eruptions[name]["time"]).dt.total_seconds() / 3600
+        res["eruption"] = name
+        res["color"] = color_map[name]
+
+        frames.append(res)
+
+    return pd.concat(frames, ignore_index=True, copy=False) if frames else pd.DataFrame()
+
+
+# -----------------------------------------------------------
+# Niveau d'alerte (barre latérale)
+# -----------------------------------------------------------
+
+def render_risk():
+    try:
+        latest_rsam = _latest_rsam()
+    except:
+        latest_rsam = 500
+
+    # Niveau d'alerte : seuils RSAM triés, un niveau de plus par seuil dépassé
+    level, color, emoji = _RSAM_META[int(np.searchsorted(_RSAM_TH, np.nan_to_num(latest_rsam)))]
+
+    st.sidebar.markdown(f"""
+<div style='text-align:center; padding:20px; border-radius:20px; background:linear-gradient(135deg, #1a1a1a, #2d2d2d); border:3px solid {color}; box-shadow:0 0 30px {color}40;'>
+    <h1 style='margin:0; color:{color}; font-size:60px;'>{emoji}</h1>
+    <h2 style='margin:10px 0 5px; color:white;'>{level}</h2>
+    <p style='margin:0; color:#ccc; font-size:14px;'>RSAM: {latest_rsam:,.0f}</p>
+</div>
+""", unsafe_allow_html=True)
+
+
+# -----------------------------------------------------------
+# Barre latérale : alerte + sélection des comparatifs
+# -----------------------------------------------------------
+
+def render_sidebar():
+    """
+    Affiche la barre latérale et renvoie (éruptions, stations) à comparer.
+    """
+    st.sidebar.image("https://media.gettyimages.com/id/110834060/fr/photo/reunion-eruption-of-the-piton-de-la-fournaise-in-reunion-on-april-03-2007-piton-de-la.jpg?s=612x612&w=0&k=20&c=32ejXjNKw5GpQf9ypQdWXSHV8BIhbkNW9hw8m9zu9nE=")
+    st.sidebar.title("Système d'alerte en temps réel")
+
+    render_risk()
+
+    # Sidebar selection for comparison
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Éruptions comparées")
+    selected_for_compare = st.sidebar.multiselect(
+        "Sélectionnez les éruptions à comparer",
+        options=_ERUPTION_KEYS,
+        default=_ERUPTION_KEYS
+    )
+    st.sidebar.markdown("### Stations pour les comparatifs")
+    selected_compare_stations = st.sidebar.multiselect(
+        "Stations à inclure dans les comparatifs",
+        options=_STATION_KEYS,
+        default=_STATION_KEYS
+    )
+
+    return selected_for_compare, selected_compare_stations
+
+
+# -----------------------------------------------------------
+# Carte des stations + paramètres
+# -----------------------------------------------------------
+
+def render_map():
+    st.markdown("### Stations sismiques actives")
+    col_map, col_controls = st.columns([7, 3])
+
+    with col_map:
+        selected_main = st.session_state.get("main_eruption_map", _ERUPTION_KEYS[0])
+
+        df_map = load_eruption_file(selected_main)
+        erupt_time = eruptions[selected_main]["time"]
+        df_map = df_map[df_map["time_min"] >= erupt_time - pd.Timedelta(days=4)]
+
+        tile_option = st.radio(
+            "Style de carte",
+            options=["Street (OpenStreetMap)", "Satellite (Google)", "Topographic (OpenTopoMap)"],
+            index=1,
+            horizontal=True,
+            key="map_tile_selector"
+        )
+
+        if tile_option == "Street (OpenStreetMap)":
+            tiles = "OpenStreetMap"; attr = "© OpenStreetMap contributors"
+        elif tile_option == "Satellite (Google)":
+            tiles = "https://mt1.google.com/vt/lyrs=s&x={x}&y={y}&z={z}&s=Galileo"; attr = "© Google"
+        else:
+            tiles = "https://tile.opentopomap.org/{z}/{x}/{y}.png"; attr = "© OpenTopoMap"
+
+        selected_stations_map = tuple(st.session_state.get("selected_stations_map", []))
+        # Carte neuve à chaque rerun : st_folium la rend à chaque appel et
+        # une carte partagée accumulerait les scripts des marqueurs
+        m = create_station_map(list(selected_stations_map), tiles, attr)
+
+        # Clé stable tant que les entrées de la carte ne changent pas
+        map_sig = hashlib.blake2b(
+            repr((selected_stations_map, tile_option, selected_main)).encode(), digest_size=8
+        ).hexdigest()
+        st_folium(m, width=700, height=555, key=f"map_{map_sig}")
+
+    with col_controls:
+        st.markdown("**Paramètres de la carte**")
+        selected_main = st.selectbox("Éruption pour l'affichage de la carte", options=_ERUPTION_KEYS, key="main_eruption_map")
+
+        available_stations = load_station_list(selected_main)
+
+        selected_stations_map = st.multiselect(
+            "Stations à afficher",
+            options=available_stations,
+            default=available_stations[:10],
+            key="selected_stations_map"
+        )
+
+
+# -----------------------------------------------------------
+# Graphes comparatifs
+# -----------------------------------------------------------
+
+def render_plots(df_compare, selected_eruptions):
+    if df_compare.empty:
+        return
+
+    st.markdown("---")
+    st.markdown(f"# Précurseurs pré-éruptifs – {len(selected_eruptions)} éruptions alignées")
+
+    st.subheader("Amplitude sismique moyenne du réseau")
+    st.plotly_chart(plot_amplitude(df_compare), use_container_width=True)
+
+    st.subheader("RSAM – mesure en temps réel")
+    st.plotly_chart(plot_rsam(df_compare), use_container_width=True)
+
+    st.subheader("Énergie sismique cumulée libérée")
+    st.plotly_chart(plot_energy(df_compare), use_container_width=True)
+
+    st.subheader("Amplitude ± IC95%")
+    st.plotly_chart(plot_confidence(df_compare), use_container_width=True)
@@ -2,10 +2,113 @@
 # data_loader.py — chargement + preprocessing
 # ============================================
 
+import json
+import os
+import tempfile
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+import streamlit as st
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from Dashboard_VF.Dashboard.preprocess import preprocess_data
-from Dashboard_VF.Dashboard.constants import DATA_DIR, eruptions
+from Dashboard_VF.Dashboard.constants import DATA_DIR, CACHE_DIR, eruptions
+
+# Types compacts appliqués dès la lecture du CSV (schéma Arrow)
+CSV_TYPES = {
+    "station": pa.dictionary(pa.int32(), pa.string()),
+    "channel": pa.dictionary(pa.int32(), pa.string()),
+    "time_min": pa.timestamp("ns", tz="UTC"),
+    "amplitude_mean": pa.float32(),
+    "amplitude_std": pa.float32(),
+    "amplitude_min": pa.float32(),
+    "amplitude_max": pa.float32(),
+}
+
+# Bornes de la fenêtre pré-découpée (heures avant / après l'éruption)
+WINDOW_BEFORE_H = 82
+WINDOW_AFTER_H = 24
+
+
+def _is_fresh(cache_path: Path, src: Path) -> bool:
+    """Vrai si le fichier de cache existe et n'est pas plus ancien que la source."""
+    return cache_path.exists() and cache_path.stat().st_mtime >= src.stat().st_mtime
+
+
+def _write_atomic(cache_path: Path, write) -> None:
+    """
+    Écrit un fichier de cache via un fichier temporaire unique du même
+    dossier, puis le renomme : un lecteur ne voit jamais de fichier partiel,
+    même si plusieurs sessions construisent le même cache en même temps.
+    """
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, cache_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+# -----------------------------------------------------------
+# Lecture d’un CSV brut, avec copie Parquet typée en cache
+# -----------------------------------------------------------
+
+def read_eruption_csv(path: Path) -> pd.DataFrame:
+    """
+    Lit un CSV d'éruption avec des types compacts (float32 / category).
+    Le CSV est analysé par PyArrow (multi-thread) et une copie Parquet est
+    écrite dans CACHE_DIR à la première lecture, puis réutilisée tant que
+    le CSV n'a pas été modifié.
+    """
+    cache_path = CACHE_DIR / f"{path.stem}_raw.parquet"
+
+    if _is_fresh(cache_path, path):
+        return pd.read_parquet(cache_path, engine="pyarrow")
+
+    tbl = pacsv.read_csv(path, convert_options=pacsv.ConvertOptions(column_types=CSV_TYPES))
+    df = tbl.to_pandas()
+
+    _write_atomic(cache_path, lambda tmp: pq.write_table(tbl, tmp, compression="zstd"))
+    _write_station_list(path, df["station"])
+
+    return df
+
+
+# -----------------------------------------------------------
+# Liste des stations d’un fichier (fichier JSON annexe)
+# -----------------------------------------------------------
+
+def _write_station_list(path: Path, stations: pd.Series) -> list:
+    station_list = sorted(stations.unique().tolist())
+
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(station_list, f)
+
+    _write_atomic(CACHE_DIR / f"{path.stem}_stations.json", write)
+    return station_list
+
+
+def load_station_list(eruption_name: str) -> list:
+    """
+    Stations présentes dans le fichier d'une éruption, triées. Lu depuis
+    le JSON écrit avec le cache Parquet, sans charger les données.
+    """
+    path = DATA_DIR / eruptions[eruption_name]["file"]
+    json_path = CACHE_DIR / f"{path.stem}_stations.json"
+
+    if _is_fresh(json_path, path):
+        with open(json_path) as f:
+            return json.load(f)
+
+    return _write_station_list(path, read_eruption_csv(path)["station"])
+
 
 # -----------------------------------------------------------
 # Chargement d’un fichier d’éruption + preprocessing complet
@@ -14,11 +117,18 @@ from Dashboard_VF.Dashboard.constants import DATA_DIR, eruptions
 def load_eruption_file(eruption_name: str) -> pd.DataFrame:
     """
     Charge et prétraite le fichier d'une éruption choisie.
+    Le résultat est mis en cache par Streamlit, clé (nom, mtime du CSV).
     """
+    path = DATA_DIR / eruptions[eruption_name]["file"]
+    return _load_eruption_file(eruption_name, os.path.getmtime(path))
+
+
+@st.cache_data(ttl=None, max_entries=16, show_spinner=False)
+def _load_eruption_file(eruption_name: str, mtime: float) -> pd.DataFrame:
     info = eruptions[eruption_name]
     path = DATA_DIR / info["file"]
 
-    df = pd.read_csv(path)
+    df = read_eruption_csv(path)
     df = preprocess_data(df)
 
     return df
@@ -29,10 +139,16 @@ def load_eruption_file(eruption_name: str) -> pd.DataFrame:
 # -----------------------------------------------------------
 
 def load_raw_file(eruption_name: str) -> pd.DataFrame:
+    path = DATA_DIR / eruptions[eruption_name]["file"]
+    return _load_raw_file(eruption_name, os.path.getmtime(path))
+
+
+@st.cache_data(ttl=None, max_entries=16, show_spinner=False)
+def _load_raw_file(eruption_name: str, mtime: float) -> pd.DataFrame:
     info = eruptions[eruption_name]
     path = DATA_DIR / info["file"]
 
-    df = pd.read_csv(path)
+    df = read_eruption_csv(path)
     df["time_min"] = pd.to_datetime(df["time_min"], utc=True)
 
     return df
@@ -42,11 +158,200 @@ def load_raw_file(eruption_name: str) -> pd.DataFrame:
 # Extraction d’une fenêtre temporelle relative à l’éruption
 # -----------------------------------------------------------
 
+def _minutes_window(df: pd.DataFrame, info: dict, hours_before, hours_after) -> pd.DataFrame:
+    # Lignes de [-hours_before, +hours_after] + minutes_to_eruption
+    # (int16 tant que la fenêtre tient dans ±32767 min, int32 au-delà)
+    ns = df["time_min"].to_numpy(dtype="datetime64[ns]").view("i8")
+    minutes = (ns - info["time"].value) // (60 * 10**9)
+    keep = (minutes >= -60 * hours_before) & (minutes <= 60 * hours_after)
+
+    df = df[keep].reset_index(drop=True)
+    small = 60 * max(hours_before, hours_after) <= np.iinfo(np.int16).max
+    df["minutes_to_eruption"] = minutes[keep].astype("int16" if small else "int32")
+    return df
+
+
+def build_window(eruption_name: str) -> Path:
+    """
+    Étape de pré-traitement : ne garde que [-82h, +24h] autour de l'éruption
+    (après preprocessing du fichier complet), ajoute minutes_to_eruption en
+    int16 et écrit le résultat dans CACHE_DIR.
+    """
+    info = eruptions[eruption_name]
+    cache_path = CACHE_DIR / f"{Path(info['file']).stem}_window.parquet"
+
+    # Hors cache Streamlit : peut tourner dans un thread de warm_resampled
+    df = preprocess_data(read_eruption_csv(DATA_DIR / info["file"]))
+    df = _minutes_window(df, info, WINDOW_BEFORE_H, WINDOW_AFTER_H)
+
+    _write_atomic(cache_path, lambda tmp: df.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False))
+
+    return cache_path
+
+
 def load_window(eruption_name: str, hours_before=48, hours_after=12):
-    df = load_raw_file(eruption_name)
-    erupt_time = eruptions[eruption_name]["time"]
+    """
+    Fenêtre temporelle relative à l'éruption.
+
+    Renvoie les lignes *prétraitées* (preprocess_data sur le fichier complet)
+    avec une colonne supplémentaire minutes_to_eruption (int16) ; avant la
+    mise en cache, cette fonction renvoyait le fichier brut non prétraité.
 
-    start = erupt_time - pd.Timedelta(hours=hours_before)
-    end = erupt_time + pd.Timedelta(hours=hours_after)
+    Dans les bornes pré-découpées ([-82h, +24h]) la fenêtre est lue depuis
+    le cache Parquet (reconstruit si le CSV source est plus récent) ; au-delà,
+    elle est recalculée depuis le fichier complet plutôt que tronquée.
+    """
+    info = eruptions[eruption_name]
+
+    if hours_before > WINDOW_BEFORE_H or hours_after > WINDOW_AFTER_H:
+        df = preprocess_data(read_eruption_csv(DATA_DIR / info["file"]))
+        return _minutes_window(df, info, hours_before, hours_after)
+
+    cache_path = CACHE_DIR / f"{Path(info['file']).stem}_window.parquet"
+
+    if not _is_fresh(cache_path, DATA_DIR / info["file"]):
+        build_window(eruption_name)
+
+    df = pd.read_parquet(cache_path, engine="pyarrow")
+
+    minutes = df["minutes_to_eruption"]
+    return df[(minutes >= -60 * hours_before) & (minutes <= 60 * hours_after)]
+
+
+# -----------------------------------------------------------
+# Moyenne par station et par pas de temps (réduction NumPy)
+# -----------------------------------------------------------
+
+def bucket_mean(df: pd.DataFrame, minutes=10, with_counts=False) -> pd.DataFrame:
+    """
+    Équivalent de groupby("station").resample(...).mean(numeric_only=True),
+    calculé avec np.add.reduceat sur des indices de pas entiers.
+    Les pas sans aucune mesure ne sont pas générés.
+    Avec with_counts=True, ajoute pour chaque colonne une colonne n_<col>
+    (nombre de mesures non NaN du pas), utilisée par network_mean.
+    """
+    codes, stations = pd.factorize(df["station"])
+    ns = df["time_min"].to_numpy(dtype="datetime64[ns]").view("i8")
+    step = minutes * 60 * 10**9
+    bucket = ns // step
+
+    order = np.lexsort((bucket, codes))
+    codes, bucket = codes[order], bucket[order]
+
+    cols = df.select_dtypes("number").columns
+    values = df[cols].to_numpy(dtype="float64")[order]
+    valid = ~np.isnan(values)
+
+    starts = np.flatnonzero((np.diff(codes) != 0) | (np.diff(bucket) != 0)) + 1
+    starts = np.concatenate(([0], starts)) if len(bucket) else starts
+
+    sums = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0)
+    counts = np.add.reduceat(valid, starts, axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+
+    res = pd.DataFrame(means, columns=cols)
+    if with_counts:
+        res[[f"n_{c}" for c in cols]] = counts.astype("int32")
+    res.insert(0, "station", stations[codes[starts]])
+    res.insert(1, "time_min", pd.to_datetime(bucket[starts] * step, utc=True))
+    return res
+
+
+# -----------------------------------------------------------
+# Moyenne réseau : toutes stations confondues, par pas de temps
+# -----------------------------------------------------------
+
+def network_mean(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Moyenne réseau par pas de temps d'une table (station, time_min) issue de
+    bucket_mean : les valeurs sont rangées dans un cube
+    (temps × colonne × station) puis réduites en une seule opération NumPy
+    sur l'axe des stations (NaN ignorés).
+    Si les colonnes n_<col> sont présentes, chaque moyenne de station est
+    pondérée par son nombre de mesures : le résultat est la moyenne de toutes
+    les mesures du pas, comme resample(...).mean() sur les données brutes.
+    Sans elles, c'est la moyenne simple des moyennes de stations.
+    """
+    t_codes, times = pd.factorize(df["time_min"], sort=True)
+    s_codes, _ = pd.factorize(df["station"])
+    num = df.select_dtypes("number").columns
+    cols = [c for c in num if not c.startswith("n_")]
+    n_cols = [f"n_{c}" for c in cols]
+    shape = (len(times), len(cols), s_codes.max() + 1)
+
+    cube = np.full(shape, np.nan)
+    cube[t_codes, :, s_codes] = df[cols].to_numpy(dtype="float64")
+
+    weights = np.zeros(shape)
+    if set(n_cols).issubset(df.columns):
+        weights[t_codes, :, s_codes] = df[n_cols].to_numpy(dtype="float64")
+    else:
+        weights[t_codes, :, s_codes] = 1.0
+    weights[np.isnan(cube)] = 0.0
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.nan_to_num(cube * weights).sum(axis=2) / weights.sum(axis=2)
+
+    res = pd.DataFrame(means, columns=cols)
+    res.insert(0, "time_min", times)
+    return res
+
+
+# -----------------------------------------------------------
+# Fenêtre alignée ré-échantillonnée à 10 min, par station
+# (calculée une fois par éruption puis relue depuis le cache)
+# -----------------------------------------------------------
+
+def _resampled_path(eruption_name: str) -> Path:
+    return CACHE_DIR / f"{Path(eruptions[eruption_name]['file']).stem}_resampled.parquet"
+
+
+def load_resampled(eruption_name: str) -> pd.DataFrame:
+    """
+    Renvoie la fenêtre [-80h, +24h] de l'éruption, moyennée par pas de
+    10 min et par station, avec les colonnes de comptage n_<col>.
+    Le résultat est écrit en Parquet dans CACHE_DIR et relu tant que le
+    CSV source n'a pas été modifié.
+    """
+    src = DATA_DIR / eruptions[eruption_name]["file"]
+    cache_path = _resampled_path(eruption_name)
+
+    if _is_fresh(cache_path, src):
+        return pd.read_parquet(cache_path, engine="pyarrow")
+
+    df = load_window(eruption_name, hours_before=80, hours_after=24)
+
+    res = bucket_mean(df.drop(columns="minutes_to_eruption"), minutes=10, with_counts=True)
+
+    _write_atomic(cache_path, lambda tmp: res.to_parquet(tmp, engine="pyarrow", index=False))
+
+    return res
+
+
+def warm_resampled(eruption_names) -> None:
+    """
+    Construit en parallèle (un thread par éruption) les caches Parquet de
+    load_resampled qui manquent ou sont périmés. PyArrow et pandas libèrent
+    le GIL pendant la lecture et le calcul ; la chaîne appelée
+    (load_resampled -> load_window -> build_window) n'utilise pas le cache
+    Streamlit, donc aucun verrou n'est partagé avec les sessions.
+    """
+    stale = [
+        name for name in eruption_names
+        if not _is_fresh(_resampled_path(name), DATA_DIR / eruptions[name]["file"])
+    ]
+    if len(stale) < 2:
+        return
+
+    with ThreadPoolExecutor(max_workers=min(len(stale), os.cpu_count() or 1)) as ex:
+        list(ex.map(load_resampled, stale))
+
+
+# -----------------------------------------------------------
+# Pré-calcul hors ligne des fenêtres de toutes les éruptions
+# -----------------------------------------------------------
 
-    return df[(df["time_min"] >= start) & (df["time_min"] <= end)]
+if __name__ == "__main__":
+    for name in eruptions:
+        print(f"{name} -> {build_window(name)}")
@@ -6,6 +6,21 @@ import numpy as np
 import plotly.graph_objects as go
 from Dashboard_VF.Dashboard.constants import eruptions, color_map, rgba_map
 
+HOVER = "%{fullData.name}<br>%{x:.1f} h<br>%{y:,.1f}<extra></extra>"
+
+
+def _line_xy(hours, values, step=10 / 60):
+    """
+    Insère un point à y = NaN dans chaque trou de la série (écart > 1 pas
+    de 10 min) : une seule trace par éruption, mais la ligne est coupée sur
+    les trous. x reste croissant.
+    """
+    x = np.asarray(hours, dtype="float64")
+    y = np.asarray(values, dtype="float64")
+    gaps = np.flatnonzero(np.diff(x) > 1.5 * step) + 1
+    return np.insert(x, gaps, x[gaps - 1] + step), np.insert(y, gaps, np.nan)
+
+
 # -----------------------------------------------------------
 # 1. Courbe : amplitude moyenne
 # -----------------------------------------------------------
@@ -13,16 +28,18 @@ from Dashboard_VF.Dashboard.constants import eruptions, color_map, rgba_map
 def plot_amplitude(df_compare):
     fig = go.Figure()
 
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption]
-        c = sub["color"].iloc[0]
+    for eruption, sub in df_compare.groupby("eruption", sort=False):
+        c = color_map[eruption]
 
-        fig.add_trace(go.Scatter(
-            x=sub["hours_to_eruption"],
-            y=sub["amplitude_mean"],
+        x, y = _line_xy(sub["hours_to_eruption"], sub["amplitude_mean"])
+
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
             mode="lines",
             name=eruption,
-            line=dict(width=4, color=c)
+            line=dict(width=4, color=c),
+            hovertemplate=HOVER
         ))
 
     fig.add_vline(x=0, line=dict(color="red", width=4, dash="dash"))
@@ -30,6 +47,7 @@ def plot_amplitude(df_compare):
     fig.update_layout(
         height=500,
         template="simple_white",
+        uirevision="compare",
         xaxis_title="Heures avant/après éruption",
         yaxis_title="Amplitude moyenne"
     )
@@ -43,16 +61,18 @@ def plot_amplitude(df_compare):
 def plot_rsam(df_compare):
     fig = go.Figure()
 
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption]
-        c = sub["color"].iloc[0]
+    for eruption, sub in df_compare.groupby("eruption", sort=False):
+        c = color_map[eruption]
 
-        fig.add_trace(go.Scatter(
-            x=sub["hours_to_eruption"],
-            y=sub["RSAM"],
+        x, y = _line_xy(sub["hours_to_eruption"], sub["RSAM"])
+
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
             mode="lines",
             name=eruption,
-            line=dict(width=4, color=c)
+            line=dict(width=4, color=c),
+            hovertemplate=HOVER
         ))
 
     fig.add_vline(x=0, line=dict(color="red", width=4, dash="dash"))
@@ -60,6 +80,7 @@ def plot_rsam(df_compare):
     fig.update_layout(
         height=500,
         template="simple_white",
+        uirevision="compare",
         xaxis_title="Heures avant/après éruption",
         yaxis_title="RSAM"
     )
@@ -73,18 +94,21 @@ def plot_rsam(df_compare):
 def plot_energy(df_compare):
     fig = go.Figure()
 
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption].sort_values("hours_to_eruption")
+    for eruption, sub in df_compare.groupby("eruption", sort=False):
+        sub = sub.sort_values("hours_to_eruption")
         energy = (sub["amplitude_mean"]**2).cumsum()
 
-        c = sub["color"].iloc[0]
+        c = color_map[eruption]
 
-        fig.add_trace(go.Scatter(
-            x=sub["hours_to_eruption"],
-            y=energy,
+        x, y = _line_xy(sub["hours_to_eruption"], energy)
+
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
             mode="lines",
             name=eruption,
-            line=dict(width=4, color=c)
+            line=dict(width=4, color=c),
+            hovertemplate=HOVER
         ))
 
     fig.add_vline(x=0, line=dict(color="red", width=4, dash="dash"))
@@ -92,6 +116,7 @@ def plot_energy(df_compare):
     fig.update_layout(
         height=500,
         template="simple_white",
+        uirevision="compare",
         xaxis_title="Heures avant/après éruption",
         yaxis_title="Énergie sismique cumulée"
     )
@@ -105,9 +130,7 @@ def plot_energy(df_compare):
 def plot_confidence(df_compare):
     fig = go.Figure()
 
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption]
-
+    for eruption, sub in df_compare.groupby("eruption", sort=False):
         sub = sub.set_index("time_min")["amplitude_mean"]
         res = sub.resample("10min").mean()
 
@@ -123,7 +146,7 @@ def plot_confidence(df_compare):
         color = color_map[eruption]
         rgba = rgba_map[color]
 
-        fig.add_trace(go.Scatter(
+        fig.add_trace(go.Scattergl(
             x=hours,
             y=mean,
             mode="lines",
@@ -131,6 +154,7 @@ def plot_confidence(df_compare):
             line=dict(color=color, width=4)
         ))
 
+        # bande remplie : reste en SVG (fill="toself")
         fig.add_trace(go.Scatter(
             x=list(hours) + list(hours[::-1]),
             y=list(upper) + list(lower[::-1]),
@@ -145,6 +169,7 @@ def plot_confidence(df_compare):
     fig.update_layout(
         height=650,
         template="simple_white",
+        uirevision="compare",
         xaxis_title="Heures",
         yaxis_title="Amplitude ± 95% IC"
     )
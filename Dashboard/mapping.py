@@ -3,9 +3,18 @@
 # ============================================
 
 import folium
+import numpy as np
 import plotly.express as px
 from Dashboard_VF.Dashboard.constants import station_coords
 
+# Table des stations en colonnes (noms / latitudes / longitudes)
+_STATIONS_SOA = {
+    "name": np.array(list(station_coords), dtype="U4"),
+    "lat": np.fromiter((v[0] for v in station_coords.values()), dtype=np.float64),
+    "lon": np.fromiter((v[1] for v in station_coords.values()), dtype=np.float64),
+}
+_NAME_SORTER = np.argsort(_STATIONS_SOA["name"])
+
 
 def create_station_map(selected_stations, tiles, attr):
     """
@@ -20,12 +29,17 @@ def create_station_map(selected_stations, tiles, attr):
 
     colors = px.colors.qualitative.Bold * 2
 
-    for i, sta in enumerate(selected_stations):
-        if sta not in station_coords:
-            continue
+    # Position dans la sélection (pour la couleur) et ligne dans la table
+    selected = np.asarray(selected_stations, dtype="U4")
+    known = np.isin(selected, _STATIONS_SOA["name"])
+    positions = np.flatnonzero(known)
+    rows = _NAME_SORTER[np.searchsorted(_STATIONS_SOA["name"], selected[known], sorter=_NAME_SORTER)]
 
-        lat, lon = station_coords[sta]
+    stations = folium.FeatureGroup(name="Stations")
 
+    for i, sta, lat, lon in zip(
+        positions, _STATIONS_SOA["name"][rows], _STATIONS_SOA["lat"][rows], _STATIONS_SOA["lon"][rows]
+    ):
         folium.CircleMarker(
             location=[lat, lon],
             radius=22,
@@ -34,13 +48,15 @@ def create_station_map(selected_stations, tiles, attr):
             fill=True,
             fill_color=colors[i % len(colors)],
             fill_opacity=0.90
-        ).add_to(m)
+        ).add_to(stations)
 
         folium.Marker(
             [lat, lon],
             icon=folium.DivIcon(
                 html=f'<div style="font-size:16px; font-weight:bold; color:white; text-shadow:2px 2px 4px black;">{sta}</div>'
             )
-        ).add_to(m)
+        ).add_to(stations)
+
+    stations.add_to(m)
 
     return m
@@ -4,6 +4,8 @@
 # All comments in English
 # ================================
 
+import os
+import tempfile
 import streamlit as st
 import pandas as pd
 import numpy as np
@@ -12,9 +14,13 @@ import plotly.graph_objects as go
 import folium
 from streamlit_folium import st_folium
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy import fft as scipy_fft
 from scipy import signal as scipy_signal
 
-from preprocess_seismic import preprocess_data
+from preprocess_seismic import preprocess_data, centered_mean_std_count
 
 st.set_page_config(page_title="Piton de la Fournaise – Seismic Surveillance", layout="wide")
 DATA_DIR = Path("data")
@@ -40,6 +46,35 @@ color_map = {
     "02 Jul 2023 – 04:30 UTC": "#911eb4",
 }
 
+# Translucent fills for the 95% CI bands (keyed by line color, then by eruption)
+RGBA_MAP = {"#e6194B":"rgba(230,25,75,0.2)", "#f58231":"rgba(245,130,49,0.2)",
+            "#ffe119":"rgba(255,225,25,0.2)", "#3cb44b":"rgba(60,180,60,0.2)",
+            "#42d4f4":"rgba(66,212,244,0.2)", "#4363d8":"rgba(67,99,216,0.2)",
+            "#911eb4":"rgba(145,30,180,0.2)"}
+NAME_RGBA = {name: RGBA_MAP[color_map[name]] for name in eruptions}
+
+# Widget options, built once and reused on every rerun
+ERUPTION_KEYS = tuple(eruptions.keys())
+
+# Eruption onsets as int64 nanoseconds since epoch (hour offsets without timedelta objects)
+ERUPTION_NS = {name: info["time"].value for name, info in eruptions.items()}
+NS_PER_HOUR = 3.6e12
+
+# Eruption labels as a fixed categorical (int8 codes instead of repeated strings)
+ERUPTION_DTYPE = pd.CategoricalDtype(categories=ERUPTION_KEYS)
+
+# ================================
+# RSAM ALERT LEVELS (sorted thresholds -> level, color, emoji)
+# ================================
+RSAM_THRESHOLDS = np.array([800, 1500, 3000, 5000])
+RSAM_LEVELS = [
+    ("NORMAL", "#00b300", "🟢"),
+    ("ELEVATED (<48h)", "#ffd700", "🟡"),
+    ("HIGH (<12h)", "#ff6600", "🟠"),
+    ("IMMINENT (<1h)", "#e60000", "🔴"),
+    ("ERUPTION", "#9f00e0", "🟪"),
+]
+
 # ================================
 # ALL OVPF STATIONS WITH REAL COORDINATES
 # ================================
@@ -65,23 +100,19 @@ st.markdown("---")
 st.sidebar.image("https://media.gettyimages.com/id/110834060/fr/photo/reunion-eruption-of-the-piton-de-la-fournaise-in-reunion-on-april-03-2007-piton-de-la.jpg?s=612x612&w=0&k=20&c=32ejXjNKw5GpQf9ypQdWXSHV8BIhbkNW9hw8m9zu9nE=")
 st.sidebar.title("Real-Time Alert System")
 
-# Latest RSAM (safe fallback)
-try:
+# Latest RSAM (safe fallback) – single scalar, cached for an hour
+@st.cache_data(ttl=3600, show_spinner=False)
+def latest_rsam_value():
     latest_data = pd.read_csv(DATA_DIR / "2023_07_02_04h_30_UTC_pf_aggregated_1min_1Hz.csv").tail(100)
-    latest_rsam = latest_data["amplitude_mean"].mean() if "amplitude_mean" in latest_data.columns else 500
+    return float(latest_data["amplitude_mean"].mean()) if "amplitude_mean" in latest_data.columns else 500.0
+
+try:
+    latest_rsam = latest_rsam_value()
 except:
     latest_rsam = 500
 
-if latest_rsam > 5000:
-    level, color, emoji = "ERUPTION", "#9f00e0", "🟪"
-elif latest_rsam > 3000:
-    level, color, emoji = "IMMINENT (<1h)", "#e60000", "🔴"
-elif latest_rsam > 1500:
-    level, color, emoji = "HIGH (<12h)", "#ff6600", "🟠"
-elif latest_rsam > 800:
-    level, color, emoji = "ELEVATED (<48h)", "#ffd700", "🟡"
-else:
-    level, color, emoji = "NORMAL", "#00b300", "🟢"
+# Alert level: one step up per threshold strictly exceeded
+level, color, emoji = RSAM_LEVELS[int(np.searchsorted(RSAM_THRESHOLDS, np.nan_to_num(latest_rsam)))]
 
 st.sidebar.markdown(f"""
 <div style="text-align:center; padding:20px; border-radius:20px; background:linear-gradient(135deg, #1a1a1a, #2d2d2d); border:3px solid {color}; box-shadow:0 0 30px {color}40;">
@@ -95,10 +126,92 @@ st.sidebar.markdown("---")
 st.sidebar.subheader("Compare Eruptions")
 selected_for_compare = st.sidebar.multiselect(
     "Select eruptions to compare",
-    options=list(eruptions.keys()),
-    default=list(eruptions.keys())
+    options=ERUPTION_KEYS,
+    default=ERUPTION_KEYS
 )
 
+# ================================
+# CSV READER – PyArrow parser + Parquet sidecars (raw and preprocessed)
+# ================================
+def write_parquet_atomic(df, pq_path, **kwargs):
+    """Write Parquet to a unique temp file next to `pq_path`, then rename it into place."""
+    with tempfile.NamedTemporaryFile(dir=pq_path.parent, prefix=f".{pq_path.name}.",
+                                     suffix=".tmp", delete=False) as tmp:
+        tmp_path = tmp.name
+    try:
+        df.to_parquet(tmp_path, engine="pyarrow", **kwargs)
+        os.replace(tmp_path, pq_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def read_eruption_table(path):
+    """Read an eruption CSV, preferring an up-to-date Parquet sidecar next to it."""
+    pq_path = path.with_suffix(".parquet")
+    if pq_path.exists() and pq_path.stat().st_mtime >= path.stat().st_mtime:
+        return pd.read_parquet(pq_path, engine="pyarrow")
+
+    df = pd.read_csv(path, engine="pyarrow", parse_dates=["time_min"])
+    write_parquet_atomic(df, pq_path, compression="zstd", index=False)
+    return df
+
+
+# Editing the feature pipeline must invalidate the preprocessed caches too
+PREPROCESS_SRC = Path(preprocess_data.__code__.co_filename)
+
+def read_preprocessed_table(path, filters=None):
+    """
+    Preprocessed eruption table, persisted next to the CSV so app restarts stay warm.
+    Rebuilt when the CSV or preprocess_seismic.py is newer than the cache.
+    `filters` (pyarrow row filters) are pushed into the Parquet scan.
+    """
+    pq_path = path.with_suffix(".preprocessed.parquet")
+    newest_src = max(path.stat().st_mtime, PREPROCESS_SRC.stat().st_mtime)
+    if pq_path.exists() and pq_path.stat().st_mtime >= newest_src:
+        return pd.read_parquet(pq_path, engine="pyarrow", filters=filters)
+
+    # Freshly read table, not shared with anyone: preprocess it in place
+    df = preprocess_data(read_eruption_table(path), copy=False)
+    df["station"] = df["station"].astype("category")
+
+    # Rows are station-major at 1 min: one-day row groups keep time_min
+    # statistics narrow enough for the scan to skip out-of-window groups.
+    # Unique temp file then rename: concurrent sessions never read a half-written file
+    write_parquet_atomic(df, pq_path, compression="zstd", index=False,
+                         row_group_size=1440, write_statistics=True)
+    if filters is None:
+        return df
+    return pd.read_parquet(pq_path, engine="pyarrow", filters=filters)
+
+
+def source_mtime(name):
+    """Modification time of an eruption's CSV, used to key the in-memory caches."""
+    return (DATA_DIR / eruptions[name]["file"]).stat().st_mtime
+
+
+def load_raw(name):
+    """Raw eruption table, parsed and preprocessed once per eruption (and CSV version)."""
+    return _load_raw(name, source_mtime(name))
+
+
+@st.cache_data(show_spinner=False)
+def _load_raw(name, mtime):
+    return read_preprocessed_table(DATA_DIR / eruptions[name]["file"])
+
+
+def station_list(name):
+    """Stations of an eruption (file order) and the one with highest mean amplitude."""
+    return _station_list(name, source_mtime(name))
+
+
+@st.cache_data(show_spinner=False)
+def _station_list(name, mtime):
+    df_raw = load_raw(name)
+    best_station = df_raw.groupby("station", observed=True)["amplitude_mean"].mean().idxmax()
+    return df_raw["station"].unique().tolist(), best_station
+
 # ================================
 # MAP + CONTROLS – ALL LAYERS WORKING PERFECTLY (Google Satellite FIXED!)
 # Stations visible • No crater circle • 555px height
@@ -109,12 +222,10 @@ col_map, col_controls = st.columns([7, 3])
 
 with col_map:
     # --- LARGE INTERACTIVE MAP ---
-    selected_main = st.session_state.get("main_eruption_map", list(eruptions.keys())[0])
+    selected_main = st.session_state.get("main_eruption_map", ERUPTION_KEYS[0])
     
     # Load data
-    df_map = pd.read_csv(DATA_DIR / eruptions[selected_main]["file"])
-    df_map["time_min"] = pd.to_datetime(df_map["time_min"], utc=True)
-    df_map = preprocess_data(df_map)
+    df_map = load_raw(selected_main)
     df_map = df_map[df_map["time_min"] >= eruptions[selected_main]["time"] - pd.Timedelta(days=4)]
 
     # Map style selector – Satellite by default
@@ -179,12 +290,11 @@ with col_controls:
 
     selected_main = st.selectbox(
         "Eruption for map view",
-        options=list(eruptions.keys()),
+        options=ERUPTION_KEYS,
         key="main_eruption_map"
     )
 
-    temp_df = pd.read_csv(DATA_DIR / eruptions[selected_main]["file"])
-    available_stations = sorted(temp_df["station"].unique())
+    available_stations = sorted(station_list(selected_main)[0])
 
     selected_stations_map = st.multiselect(
         "Stations to display",
@@ -200,157 +310,174 @@ with col_controls:
 # ================================
 # LOAD ALIGNED DATA – NOW SHOWS -80h to +24h AFTER ERUPTION
 # ================================
+def load_one_eruption(name):
+    """
+    Load and window one eruption (runs in a worker thread).
+    Returns (frame or None, message or None); Streamlit calls are left to the caller.
+    """
+    info = eruptions[name]
+    path = DATA_DIR / info["file"]
+    if not path.exists():
+        return None, ("warning", f"File not found: {info['file']}")
+
+    try:
+        # Window from -80h to +24h around the eruption (post-eruption included),
+        # filtered inside the Parquet scan so out-of-window rows are never converted
+        start_time = info["time"] - pd.Timedelta(hours=80)
+        end_time = info["time"] + pd.Timedelta(hours=24)
+        df_temp = read_preprocessed_table(
+            path, filters=[("time_min", ">=", start_time), ("time_min", "<=", end_time)]
+        )
+
+        if df_temp.empty:
+            return None, ("warning", f"No data in window for {name}")
+
+        codes = np.full(len(df_temp), ERUPTION_KEYS.index(name), dtype=np.int8)
+        return df_temp.assign(eruption=pd.Categorical.from_codes(codes, dtype=ERUPTION_DTYPE)), None
+
+    except Exception as e:
+        return None, ("error", f"Error loading {name}: {e}")
+
+
 @st.cache_data
 def load_aligned_selected(selected_list):
+    # Eruptions are independent: read + preprocess them concurrently
+    with ThreadPoolExecutor(max_workers=min(8, max(1, len(selected_list)))) as ex:
+        results = list(ex.map(load_one_eruption, selected_list))
+
+    # Streamlit calls are not thread-safe: report problems from the main thread
     all_frames = []
-    for name in selected_list:
-        info = eruptions[name]
-        path = DATA_DIR / info["file"]
-        if not path.exists():
-            st.warning(f"File not found: {info['file']}")
-            continue
-        
-        try:
-            df_temp = pd.read_csv(path)
-            df_temp["time_min"] = pd.to_datetime(df_temp["time_min"], utc=True)
-            df_temp = preprocess_data(df_temp)
-            
-            # Agora pega até +24h após a erupção
-            start_time = info["time"] - pd.Timedelta(hours=82)
-            end_time = info["time"] + pd.Timedelta(hours=24)   # ← +24h após erupção!
-            df_temp = df_temp[(df_temp["time_min"] >= start_time) & (df_temp["time_min"] <= end_time)]
-            
-            if df_temp.empty:
-                st.warning(f"No data in window for {name}")
-                continue
-                
-            df_temp["hours_to_eruption"] = (df_temp["time_min"] - info["time"]).dt.total_seconds() / 3600
-            
-            # Agora mostra de -80h até +24h (pós-erupção!)
-            df_temp = df_temp[(df_temp["hours_to_eruption"] >= -80) & (df_temp["hours_to_eruption"] <= 24)]
-            
-            resampled = df_temp.set_index("time_min").resample("10min").mean(numeric_only=True).reset_index()
-            resampled["hours_to_eruption"] = (resampled["time_min"] - info["time"]).dt.total_seconds() / 3600
-            resampled["eruption"] = name
-            resampled["color"] = color_map[name]
-            all_frames.append(resampled)
-            
-        except Exception as e:
-            st.error(f"Error loading {name}: {e}")
-    
-    return pd.concat(all_frames, ignore_index=True) if all_frames else pd.DataFrame()
+    for frame, message in results:
+        if message is not None:
+            level, text = message
+            (st.warning if level == "warning" else st.error)(text)
+        if frame is not None:
+            all_frames.append(frame)
+
+    if not all_frames:
+        return pd.DataFrame()
+
+    # One concat, then a single grouped 10-min resample for every eruption
+    big = pd.concat(all_frames, ignore_index=True, copy=False)
+    out = (big.groupby("eruption", sort=False, observed=True)
+              .resample("10min", on="time_min", include_groups=False)
+              .mean(numeric_only=True)
+              .reset_index())
+
+    t0_ns = out["eruption"].map(ERUPTION_NS).to_numpy(dtype=np.int64)
+    t_ns = out["time_min"].to_numpy(dtype="datetime64[ns]").view("i8")
+    out["hours_to_eruption"] = (t_ns - t0_ns) / NS_PER_HOUR
+    out["color"] = out["eruption"].map(color_map)
+
+    # Cumulative energy per eruption in one pass: rows are contiguous and in
+    # time order per group, so subtract the running total reached before each group
+    amp2 = out["amplitude_mean"].to_numpy() ** 2
+    total = np.nancumsum(amp2)
+    codes = pd.factorize(out["eruption"])[0]
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    before = np.r_[0.0, total[starts[1:] - 1]]
+    energy = total - np.repeat(before, np.diff(np.r_[starts, len(out)]))
+    energy[np.isnan(amp2)] = np.nan  # empty bins stay gaps
+    out["energy"] = energy
+    return out
 
 df_compare = load_aligned_selected(selected_for_compare)
 
+# ================================
+# PER-ERUPTION ARRAYS – built once, shared by every figure
+# ================================
+series = {}
+if not df_compare.empty:
+    for name, g in df_compare.groupby("eruption", sort=False, observed=True):
+        series[name] = {
+            "h": g["hours_to_eruption"].to_numpy(),
+            "amp": g["amplitude_mean"].to_numpy(),
+            "RSAM": g["RSAM"].to_numpy() if "RSAM" in g.columns else None,
+            "SE": g["SE_env"].to_numpy() if "SE_env" in g.columns else None,
+            "Kurt": g["Kurt_env"].to_numpy() if "Kurt_env" in g.columns else None,
+            "energy": g["energy"].to_numpy(),
+            "color": color_map[name],
+        }
+
 # ================================
 # ALL GRAPHS (now all 7 eruptions appear)
+# Line traces are drawn with WebGL (Scattergl): smooth pan/zoom across 7 eruptions
 # ================================
 if not df_compare.empty:
     st.markdown("---")
     st.markdown(f"# Pre-Eruptive Precursors – {len(selected_for_compare)} Eruptions Aligned (t=0 = eruption)")
 
-    # 1. Network Mean Seismic Amplitude
+    fig1, fig2, fig3, fig_se, fig_k, fig4 = (go.Figure() for _ in range(6))
+
+    # One pass over the eruptions feeds every figure
+    for eruption, sr in series.items():
+        line = dict(width=5, color=sr["color"])
+
+        # 1. Network Mean Seismic Amplitude
+        fig1.add_trace(go.Scattergl(x=sr["h"], y=sr["amp"], mode="lines", name=eruption, line=line))
+
+        # 2. RSAM
+        if sr["RSAM"] is not None:
+            fig2.add_trace(go.Scattergl(x=sr["h"], y=sr["RSAM"], mode="lines", name=eruption, line=line))
+
+        # 3. Cumulative Seismic Energy Released
+        fig3.add_trace(go.Scattergl(x=sr["h"], y=sr["energy"], mode="lines", name=eruption, line=line))
+
+        # 4. Shannon Entropy
+        if sr["SE"] is not None:
+            fig_se.add_trace(go.Scattergl(x=sr["h"], y=sr["SE"], mode="lines", name=eruption, line=line))
+
+        # 5. Frequency Index
+
+        # 6. Kurtosis
+        if sr["Kurt"] is not None:
+            fig_k.add_trace(go.Scattergl(x=sr["h"], y=sr["Kurt"], mode="lines", name=eruption, line=line))
+
+        # 7. Network Mean + 95% CI
+        # Already on the 10-min grid: centered 1-hour window in one numba pass
+        mean_roll, std_roll, count_roll = centered_mean_std_count(sr["amp"], 6, 3)
+        hours = sr["h"]
+        upper = mean_roll + 1.96 * std_roll / np.sqrt(count_roll)
+        lower = mean_roll - 1.96 * std_roll / np.sqrt(count_roll)
+        fig4.add_trace(go.Scattergl(x=hours, y=mean_roll, mode="lines", name=eruption, line=line))
+        # CI band: invisible lower bound, then upper bound filled down to it
+        fig4.add_trace(go.Scattergl(x=hours, y=lower, mode="lines",
+                                 line=dict(width=0), showlegend=False, hoverinfo="skip"))
+        fig4.add_trace(go.Scattergl(x=hours, y=upper, mode="lines",
+                                 fill="tonexty", fillcolor=NAME_RGBA[eruption],
+                                 line=dict(width=0), showlegend=False, hoverinfo="skip"))
+
+    # Eruption marker + layout, once per figure
+    for fig_line, y_title in ((fig1, "Amplitude (counts)"), (fig2, "RSAM (counts)"),
+                              (fig3, "Cumulative Energy (counts²)"), (fig_se, "Shannon Entropy"),
+                              (fig_k, "Kurtosis")):
+        fig_line.add_vline(x=0, line=dict(color="red", width=5, dash="dash"))
+        fig_line.update_layout(height=550, template="simple_white",
+                               xaxis_title="Hours Before Eruption", yaxis_title=y_title)
+
+    fig4.add_vline(x=0, line=dict(color="red", width=5, dash="dash"))
+    fig4.add_annotation(x=-3, y=0.93, yref="paper", text="ERUPTION",
+                        showarrow=False, font=dict(size=18, color="red"), textangle=-90)
+    fig4.update_layout(height=650, template="simple_white",
+                       xaxis_title="Hours Before Eruption",
+                       yaxis_title="Amplitude ± 95% CI (counts)")
+
     st.subheader("Network Mean Seismic Amplitude")
-    fig1 = go.Figure()
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption]
-        fig1.add_trace(go.Scatter(x=sub["hours_to_eruption"], y=sub["amplitude_mean"],
-                                 mode="lines", name=eruption,
-                                 line=dict(width=5, color=sub["color"].iloc[0])))
-    fig1.add_vline(x=0, line=dict(color="red", width=5, dash="dash"))
-    fig1.update_layout(height=550, template="simple_white",
-                       xaxis_title="Hours Before Eruption", yaxis_title="Amplitude (counts)")
     st.plotly_chart(fig1, use_container_width=True)
 
-    # 2. RSAM
     st.subheader("RSAM – Real-time Seismic Amplitude Measurement")
-    fig2 = go.Figure()
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption]
-        if "RSAM" in sub.columns:
-            fig2.add_trace(go.Scatter(x=sub["hours_to_eruption"], y=sub["RSAM"],
-                                     mode="lines", name=eruption,
-                                     line=dict(width=5, color=sub["color"].iloc[0])))
-    fig2.add_vline(x=0, line=dict(color="red", width=5, dash="dash"))
-    fig2.update_layout(height=550, template="simple_white",
-                       xaxis_title="Hours Before Eruption", yaxis_title="RSAM (counts)")
     st.plotly_chart(fig2, use_container_width=True)
 
-    # 3. Cumulative Seismic Energy Released
     st.subheader("Cumulative Seismic Energy Released")
-    fig3 = go.Figure()
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption].sort_values("hours_to_eruption").copy()
-        sub["energy"] = (sub["amplitude_mean"]**2).cumsum()
-        fig3.add_trace(go.Scatter(x=sub["hours_to_eruption"], y=sub["energy"],
-                                 mode="lines", name=eruption,
-                                 line=dict(width=5, color=sub["color"].iloc[0])))
-    fig3.add_vline(x=0, line=dict(color="red", width=5, dash="dash"))
-    fig3.update_layout(height=550, template="simple_white",
-                       xaxis_title="Hours Before Eruption", yaxis_title="Cumulative Energy (counts²)")
     st.plotly_chart(fig3, use_container_width=True)
 
-    # 4. Shannon Entropy
     st.subheader("Shannon Entropy")
-    fig_se = go.Figure()
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption]
-        if "SE_env" in sub.columns:
-            fig_se.add_trace(go.Scatter(x=sub["hours_to_eruption"], y=sub["SE_env"],
-                                       mode="lines", name=eruption,
-                                       line=dict(width=5, color=sub["color"].iloc[0])))
-    fig_se.add_vline(x=0, line=dict(color="red", width=5, dash="dash"))
-    fig_se.update_layout(height=550, template="simple_white",
-                         xaxis_title="Hours Before Eruption", yaxis_title="Shannon Entropy")
     st.plotly_chart(fig_se, use_container_width=True)
 
-    # 5. Frequency Index
-
-    # 6. Kurtosis
     st.subheader("Kurtosis")
-    fig_k = go.Figure()
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption]
-        if "Kurt_env" in sub.columns:
-            fig_k.add_trace(go.Scatter(x=sub["hours_to_eruption"], y=sub["Kurt_env"],
-                                      mode="lines", name=eruption,
-                                      line=dict(width=5, color=sub["color"].iloc[0])))
-    fig_k.add_vline(x=0, line=dict(color="red", width=5, dash="dash"))
-    fig_k.update_layout(height=550, template="simple_white",
-                        xaxis_title="Hours Before Eruption", yaxis_title="Kurtosis")
     st.plotly_chart(fig_k, use_container_width=True)
 
-    # 7. Network Mean + 95% CI
     st.subheader("Network Mean Amplitude ± 95% Confidence Interval")
-    fig4 = go.Figure()
-    for eruption in df_compare["eruption"].unique():
-        sub = df_compare[df_compare["eruption"] == eruption].copy()
-        sub = sub.set_index("time_min")["amplitude_mean"]
-        resampled = sub.resample("10min").mean()
-        rolling = resampled.rolling(window=6, min_periods=3, center=True)
-        mean_roll = rolling.mean()
-        std_roll = rolling.std()
-        count_roll = rolling.count()
-        hours = (mean_roll.index - eruptions[eruption]["time"]).total_seconds() / 3600
-        upper = mean_roll + 1.96 * std_roll / np.sqrt(count_roll)
-        lower = mean_roll - 1.96 * std_roll / np.sqrt(count_roll)
-        color = color_map[eruption]
-        fig4.add_trace(go.Scatter(x=hours, y=mean_roll, mode="lines", name=eruption,
-                                 line=dict(color=color, width=5)))
-        rgba_map = {"#e6194B":"rgba(230,25,75,0.2)", "#f58231":"rgba(245,130,49,0.2)",
-                    "#ffe119":"rgba(255,225,25,0.2)", "#3cb44b":"rgba(60,180,60,0.2)",
-                    "#42d4f4":"rgba(66,212,244,0.2)", "#4363d8":"rgba(67,99,216,0.2)",
-                    "#911eb4":"rgba(145,30,180,0.2)"}
-        fig4.add_trace(go.Scatter(x=list(hours)+list(hours[::-1]),
-                                 y=list(upper)+list(lower[::-1]),
-                                 fill="toself", fillcolor=rgba_map[color],
-                                 line=dict(width=0), showlegend=False))
-    fig4.add_vline(x=0, line=dict(color="red", width=5, dash="dash"))
-    fig4.add_annotation(x=-3, y=0.93, yref="paper", text="ERUPTION",
-                        showarrow=False, font=dict(size=18, color="red"), textangle=-90)
-    fig4.update_layout(height=650, template="simple_white",
-                       xaxis_title="Hours Before Eruption",
-                       yaxis_title="Amplitude ± 95% CI (counts)")
     st.plotly_chart(fig4, use_container_width=True)
 
 # ================================
@@ -366,88 +493,131 @@ col1, col2 = st.columns([1, 1])
 with col1:
     spec_eruption = st.selectbox(
         "Select Eruption",
-        options=list(eruptions.keys()),
+        options=ERUPTION_KEYS,
         key="spec_e"
     )
 with col2:
-    # Load raw data
-    df_raw = pd.read_csv(DATA_DIR / eruptions[spec_eruption]["file"])
-    df_raw["time_min"] = pd.to_datetime(df_raw["time_min"], utc=True)  # ← CORRIGIDO: utc=True
-    df_raw = preprocess_data(df_raw)
-    
-    # Select station with highest average amplitude (closest to eruption)
-    best_station = df_raw.groupby("station")["amplitude_mean"].mean().idxmax()
-    
+    # Station with highest average amplitude (closest to eruption) preselected
+    spec_stations, best_station = station_list(spec_eruption)
+
     spec_station = st.selectbox(
         "Station",
-        options=df_raw["station"].unique(),
-        index=0 if best_station not in df_raw["station"].unique() else list(df_raw["station"].unique()).index(best_station),
+        options=spec_stations,
+        index=spec_stations.index(best_station) if best_station in spec_stations else 0,
         key="spec_s"
     )
 
-# Time window: 48h before to 12h after eruption
-erupt_time = eruptions[spec_eruption]["time"]
-start_time = erupt_time - pd.Timedelta(hours=48)
-end_time = erupt_time + pd.Timedelta(hours=12)
-
-# Filter data for selected station and time window
-df = df_raw[
-    (df_raw["station"] == spec_station) &
-    (df_raw["time_min"] >= start_time) &
-    (df_raw["time_min"] <= end_time)
-].copy()
+@lru_cache(maxsize=4)
+def spectrogram_window(nperseg):
+    """Hamming window (float32) and its power-spectrum scale 1/sum(w)², built once per length."""
+    window = scipy_signal.get_window("hamming", nperseg).astype(np.float32)
+    window.flags.writeable = False
+    return window, 1.0 / float(window.sum()) ** 2
+
+
+def power_spectrogram(sig, fs, nperseg, noverlap):
+    """
+    One-sided power spectrum of overlapping Hamming frames, real FFT on all cores.
+    Same (f, t, Sxx) as scipy_signal.spectrogram(..., detrend=False, scaling='spectrum').
+    """
+    window, scale = spectrogram_window(nperseg)
+    step = nperseg - noverlap
+
+    # Frames are strided views of the signal: no copy until the window is applied
+    frames = sliding_window_view(sig, nperseg)[::step]
+    spec = scipy_fft.rfft(frames * window, axis=-1, workers=-1)
+    Sxx = (spec.real ** 2 + spec.imag ** 2) * scale
+
+    # Fold negative frequencies: double every bin except DC (and Nyquist for even lengths)
+    Sxx[:, 1:(None if nperseg % 2 else -1)] *= 2
+
+    f = scipy_fft.rfftfreq(nperseg, 1 / fs)
+    t = (nperseg / 2 + step * np.arange(frames.shape[0])) / fs
+    return f, t, Sxx.T
+
+
+@st.cache_data(show_spinner=False)
+def compute_spectrogram(eruption, station, version):
+    """
+    Spectrogram arrays for one (eruption, station), from -48h to +12h.
+    `version` is the source file mtime, so an updated CSV invalidates the entry.
+    Returns (t_spec_hours, f_plot, Z, zmin, zmax), or None when there are too few points.
+    """
+    df_raw = load_raw(eruption)
+
+    # Time window: 48h before to 12h after eruption
+    erupt_time = eruptions[eruption]["time"]
+    start_time = erupt_time - pd.Timedelta(hours=48)
+    end_time = erupt_time + pd.Timedelta(hours=12)
+
+    # Filter data for selected station and time window
+    df = df_raw[
+        (df_raw["station"] == station) &
+        (df_raw["time_min"] >= start_time) &
+        (df_raw["time_min"] <= end_time)
+    ]
+
+    if len(df) < 100:
+        return None
 
-if len(df) < 100:
-    st.error("Not enough data points for spectrogram. Try another station or eruption.")
-else:
     # Prepare signal: remove mean and fill NaNs
-    sig = df["amplitude_mean"].fillna(method='ffill').values
+    sig = np.asarray(df["amplitude_mean"].ffill())
     sig = sig - np.mean(sig)  # remove DC offset
     sig = scipy_signal.detrend(sig)  # remove linear trend
-    
+
     # Normalize signal
     if np.std(sig) > 0:
         sig = sig / np.std(sig)
-    
-    # Time vector relative to eruption
-    t_hours = (df["time_min"] - erupt_time).dt.total_seconds() / 3600
-    
+
+    # Single precision is plenty for a normalised 1-min signal: halves STFT memory traffic
+    sig = np.ascontiguousarray(sig, dtype=np.float32)
+
+    # Offset of the first sample relative to eruption (hours)
+    t0_hours = (df["time_min"].iloc[0].value - ERUPTION_NS[eruption]) / NS_PER_HOUR
+
     # Spectrogram parameters optimized for volcanic tremor
     fs = 1 / 60  # sampling frequency: 1 sample per minute
-    f, t, Sxx = scipy_signal.spectrogram(
-        sig,
-        fs=fs,
-        window='hamming',
-        nperseg=360,     # 6-hour window → good frequency resolution
-        noverlap=300,
-        detrend=False,
-        scaling='spectrum'
-    )
-    
+    nperseg = 360  # 6-hour window → good frequency resolution
+    if len(sig) < nperseg:
+        return None
+    f, t, Sxx = power_spectrogram(sig, fs, nperseg=nperseg, noverlap=300)
+
     # Convert spectrogram time to hours relative to eruption
-    t_spec_hours = t / 60 + t_hours.iloc[0]
-    
+    t_spec_hours = t / 60 + t0_hours
+
     # Keep only relevant frequencies (0.005 – 0.15 Hz = periods 11 min to 3.3h)
     freq_mask = (f >= 0.005) & (f <= 0.15)
     f_plot = f[freq_mask]
     Sxx_plot = Sxx[freq_mask, :]
-    
+
     # Convert to dB and enhance contrast
-    Z = 10 * np.log10(Sxx_plot + 1e-20)
-    Z = Z - Z.min()  # normalize to 0
-    
-    # Strong contrast: cut top 1% to avoid saturation
-    vmin = 0
-    vmax = np.percentile(Z, 99)
-    
+    Z = 10 * np.log10(Sxx_plot.astype(np.float32) + np.float32(1e-20))
+    if Z.size == 0:
+        return None
+
+    # Colour scale from the minimum (0 dB relative) to the 99th percentile:
+    # O(N) selection instead of a sort, and no shifted copy of Z
+    zmin = float(Z.min())
+    k = int(0.99 * (Z.size - 1))
+    zmax = float(np.partition(Z.ravel(), k)[k])
+    return t_spec_hours, f_plot, Z, zmin, zmax
+
+
+spec = compute_spectrogram(spec_eruption, spec_station, source_mtime(spec_eruption))
+
+if spec is None:
+    st.error("Not enough data points for spectrogram. Try another station or eruption.")
+else:
+    t_spec_hours, f_plot, Z, zmin, zmax = spec
+
     # Create beautiful heatmap
     fig = go.Figure(data=go.Heatmap(
         z=Z,
         x=t_spec_hours,
         y=f_plot,
         colorscale="Magma",
-        zmin=vmin,
-        zmax=vmax,
+        zmin=zmin,
+        zmax=zmax,
         colorbar=dict(title="Power (dB)", thickness=15)
     ))
     
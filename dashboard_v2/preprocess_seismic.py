@@ -1,22 +1,25 @@
 import pandas as pd
 import numpy as np
+from numba import njit
 
-def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
+def preprocess_data(df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
     """
     Full preprocessing pipeline for seismic data used in the Piton de la Fournaise dashboard.
     This version does NOT save CSV files; it only returns an enriched DataFrame.
 
     Parameters:
         df (pd.DataFrame): Raw dataframe loaded from the original CSV.
+        copy (bool): Work on a copy of `df`. Pass False when the caller owns a
+            freshly loaded frame and does not need it afterwards.
 
     Returns:
         pd.DataFrame: Processed dataframe with multiple new seismic features.
     """
 
     # -------------------------------------------------------------
-    # 1. Copy to avoid modifying the original dataframe
+    # 1. Copy to avoid modifying the original dataframe (unless told not to)
     # -------------------------------------------------------------
-    data = df.copy()
+    data = df.copy() if copy else df
 
     # -------------------------------------------------------------
     # 2. Basic cleaning
@@ -24,8 +27,8 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     data.drop_duplicates(inplace=True)
     data.dropna(how="all", inplace=True)
 
-    # Standardize timestamps
-    if "time_min" in data.columns:
+    # Standardize timestamps (skipped when the reader already parsed them)
+    if "time_min" in data.columns and not pd.api.types.is_datetime64_any_dtype(data["time_min"]):
         data["time_min"] = pd.to_datetime(data["time_min"], errors="coerce")
 
     # -------------------------------------------------------------
@@ -67,11 +70,9 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     if "amplitude_mean" in data.columns:
         data["FI"] = np.gradient(data["amplitude_mean"].fillna(0))
 
-    # Kurtosis
+    # Kurtosis (fourth moment around the 20-sample mean, fused numba kernel)
     if "amplitude_mean" in data.columns:
-        data["Kurtosis"] = (
-            (data["amplitude_mean"] - data["amplitude_mean"].rolling(20).mean())**4
-        ).rolling(20, min_periods=5).mean()
+        data["Kurtosis"] = rolling_kurtosis(data["amplitude_mean"].to_numpy(dtype=np.float64), 20, 5)
 
     # -------------------------------------------------------------
     # 5. Geophysical stress proxy (tension)
@@ -95,3 +96,86 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     data.reset_index(drop=True, inplace=True)
 
     return data
+
+
+@njit(cache=True)
+def rolling_kurtosis(x, w=20, mp=5):
+    """
+    Trailing rolling fourth moment used as the "Kurtosis" feature.
+
+    Equivalent to ``((s - s.rolling(w).mean())**4).rolling(w, min_periods=mp).mean()``
+    on ``s = pd.Series(x)``, computed in two compiled passes without
+    pandas intermediates.
+    """
+    n = x.shape[0]
+
+    # Pass 1: full-window mean (NaN unless all w values are present)
+    d4 = np.full(n, np.nan)
+    for i in range(w - 1, n):
+        acc = 0.0
+        ok = True
+        for j in range(i - w + 1, i + 1):
+            if np.isnan(x[j]):
+                ok = False
+                break
+            acc += x[j]
+        if ok:
+            d = x[i] - acc / w
+            d4[i] = d * d * d * d
+
+    # Pass 2: mean of the fourth powers over at least mp present values
+    out = np.full(n, np.nan)
+    for i in range(n):
+        acc = 0.0
+        k = 0
+        for j in range(max(i - w + 1, 0), i + 1):
+            if not np.isnan(d4[j]):
+                acc += d4[j]
+                k += 1
+        if k >= mp:
+            out[i] = acc / k
+
+    return out
+
+
+@njit(cache=True)
+def centered_mean_std_count(x, w=6, mp=3):
+    """
+    Centered rolling mean, sample std and non-NaN count in a single pass.
+
+    Same windows as ``pd.Series(x).rolling(w, min_periods=mp, center=True)``:
+    position i covers x[i - w//2 : i - w//2 + w]. Mean and std are NaN where
+    fewer than ``mp`` values are present (std also needs at least 2).
+
+    Returns:
+        (mean, std, count) as float64 arrays.
+    """
+    n = x.shape[0]
+    mean = np.full(n, np.nan)
+    std = np.full(n, np.nan)
+    count = np.zeros(n)
+    half = w // 2
+
+    for i in range(n):
+        lo = max(i - half, 0)
+        hi = min(i - half + w, n)
+
+        # Welford update over the window
+        k = 0
+        m = 0.0
+        m2 = 0.0
+        for j in range(lo, hi):
+            v = x[j]
+            if not np.isnan(v):
+                k += 1
+                d = v - m
+                m += d / k
+                m2 += d * (v - m)
+
+        count[i] = k
+        if k >= mp and k > 0:
+            mean[i] = m
+            if k > 1:
+                std[i] = np.sqrt(m2 / (k - 1))
+
+    return mean, std, count